@@ -4,22 +4,41 @@ Telegram Digest Bot - Main Application
 """
 import asyncio
 import argparse
+import atexit
+import hashlib
+import io
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import signal
 import sys
 import time
-import yaml
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
+from telethon.errors import FloodWaitError
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog is optional, fall back to mtime polling
+    Observer = None
+    FileSystemEventHandler = object
 
 # Import our modules
 from src.telegram_client import TelegramDigestClient
 from src.message_processor import MessageProcessor
 from src.digest_generator import DigestGenerator
 from src.storage import StorageManager, DigestRun
+from src.rate_limiter import RateLimiter
+from src.llm_providers import close_shared_async_client
+from src.yaml_cache import load_yaml, get_safe_loader
 
 
 # Load environment variables
@@ -32,6 +51,228 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Telegram rejects messages over 4096 characters; leave headroom for formatting
+MAX_MESSAGE_LENGTH = 4000
+MAX_SEND_ATTEMPTS = 3
+BACKUP_CLEANUP_INTERVAL_SECONDS = 24 * 60 * 60
+CONFIG_SETTLE_SECONDS = 0.2
+CONFIG_POLL_FALLBACK_SECONDS = 5 * 60
+
+_UTC = timezone.utc
+
+_STATS_FOOTER = "\n\n📊 **Stats**: {message_count} messages from {chat_count} chats"
+_VALIDATION_FOOTER = " ⚠️ {count} validation warnings"
+
+# Line templates for the per-chat digest
+_HEADER_RULE = "=" * 50 + "\n\n"
+_BULLET_FMT = "• {}\n".format
+_CALENDAR_FMT = "• {event} - {date}{time}\n".format
+_TOPIC_FMT = "• **{topic}**{participants}\n  {summary}\n".format
+_PERSON_FMT = "• **{person}**: {update}\n".format
+
+
+def _split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Split text into chunks no longer than limit, preferring paragraph then line boundaries"""
+    chunks = []
+    while len(text) > limit:
+        split_at = text.rfind("\n\n", 0, limit)
+        if split_at <= 0:
+            split_at = text.rfind("\n", 0, limit)
+        if split_at <= 0:
+            split_at = limit
+        chunks.append(text[:split_at].rstrip())
+        text = text[split_at:].lstrip("\n")
+    if text.strip():
+        chunks.append(text)
+    return chunks
+
+
+# Matches the "[chat_name] " tag the LLM puts in front of text items
+_match_chat_prefix = re.compile(r'^\[([^\]]+)\] ?').match
+_PREFIXED_SECTIONS = ("urgent", "decisions", "unanswered_mentions")
+_SOURCE_CHAT_SECTIONS = ("topics", "people_updates", "calendar")
+
+
+@dataclass(frozen=True, slots=True)
+class ChatBuckets:
+    """One chat's share of the combined structured digest, plus its per-chat stats"""
+    urgent: list = field(default_factory=list)
+    decisions: list = field(default_factory=list)
+    topics: list = field(default_factory=list)
+    people_updates: list = field(default_factory=list)
+    calendar: list = field(default_factory=list)
+    unanswered_mentions: list = field(default_factory=list)
+    message_count: int = 0
+    validation_errors: list = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class DigestMetadata:
+    """Digest-level metadata shown in the stats footer and the summary message"""
+    chat_count: int = 0
+    message_count: int = 0
+    validation_errors: list = field(default_factory=list)
+    generated_at: str = 'Unknown'
+    llm_provider: str = 'Unknown'
+    chat_details: dict = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, metadata: Optional[Dict[str, Any]]) -> 'DigestMetadata':
+        """Build from the metadata dict returned by the digest generator"""
+        metadata = metadata or {}
+        return cls(
+            chat_count=metadata.get('chat_count', 0),
+            message_count=metadata.get('message_count', 0),
+            validation_errors=metadata.get('validation_errors') or [],
+            generated_at=metadata.get('generated_at', 'Unknown'),
+            llm_provider=metadata.get('llm_provider', 'Unknown'),
+            chat_details=metadata.get('chat_details') or {}
+        )
+
+
+def _split_chat_tag(item: str, known_prefixes: list) -> Optional[tuple]:
+    """Return (chat_name, text without its tag) for a "[chat_name] text" item, or None.
+    LLM output often puts whitespace, an emoji or ** before the tag, so known tags are
+    matched at the start first and then anywhere in the item; the regex is a last resort."""
+    stripped = item.lstrip()
+    for prefix, chat_name in known_prefixes:
+        if stripped.startswith(prefix):
+            return chat_name, stripped[len(prefix):].removeprefix(" ")
+    
+    found = [(item.find(prefix), prefix, chat_name) for prefix, chat_name in known_prefixes]
+    found = [entry for entry in found if entry[0] >= 0]
+    if found:
+        # Earliest tag wins; known_prefixes is longest first, so min() keeps the longer name on a tie
+        index, prefix, chat_name = min(found, key=lambda entry: entry[0])
+        end = index + len(prefix)
+        if item[end:end + 1] == " ":
+            end += 1
+        return chat_name, item[:index] + item[end:]
+    
+    match = _match_chat_prefix(stripped)
+    if match:
+        return match.group(1), stripped[match.end():]
+    return None
+
+
+def _bucketize_by_chat(structured_data: Dict[str, Any], chat_details: Dict[str, Any]) -> Dict[str, ChatBuckets]:
+    """Group the combined digest items by chat in a single pass over each section.
+    Text items are either {"text", "source_chat"} dicts or strings with a "[chat_name] "
+    prefix; topics, people updates and calendar events carry a source_chat key."""
+    buckets = defaultdict(ChatBuckets)
+    # Known chat tags, longest first so a name that extends another one wins; matching these
+    # literally keeps names that contain "]" working
+    known_prefixes = sorted(((f"[{name}]", name) for name in chat_details), key=lambda p: -len(p[0]))
+    
+    for section in _PREFIXED_SECTIONS:
+        for item in structured_data.get(section) or []:
+            if isinstance(item, dict):
+                chat_name = item.get("source_chat")
+                if chat_name is not None:
+                    getattr(buckets[chat_name], section).append(item.get("text", ""))
+                continue
+            
+            # Legacy string form: find the chat tag and remove it for display
+            tagged = _split_chat_tag(item, known_prefixes)
+            if tagged:
+                getattr(buckets[tagged[0]], section).append(tagged[1])
+    
+    for section in _SOURCE_CHAT_SECTIONS:
+        for item in structured_data.get(section) or []:
+            chat_name = item.get("source_chat")
+            if chat_name is None:
+                continue
+            # The formatter only reads the display fields, so source_chat can stay
+            getattr(buckets[chat_name], section).append(item)
+    
+    return {
+        chat_name: replace(
+            buckets.get(chat_name) or ChatBuckets(),
+            message_count=chat_data.get('message_count', 0),
+            validation_errors=chat_data.get('validation_errors') or []
+        )
+        for chat_name, chat_data in chat_details.items()
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Snapshot of the runtime settings read from config.yaml, with all defaults in one place"""
+    interval_minutes: int = 240
+    lookback_hours: int = 72
+    max_concurrent_chats: int = 4
+    send_to_saved_messages: bool = True
+    include_json_attachment: bool = True
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Settings':
+        """Build settings from the digest and output sections of the config"""
+        digest_config = config.get('digest', {})
+        output_config = config.get('output', {})
+        return cls(
+            interval_minutes=digest_config.get('interval_minutes', 240),
+            lookback_hours=digest_config.get('lookback_hours', 72),
+            max_concurrent_chats=max(1, digest_config.get('max_concurrent_chats', 4)),
+            send_to_saved_messages=output_config.get('send_to_saved_messages', True),
+            include_json_attachment=output_config.get('include_json_attachment', True)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ChatSpec:
+    """An enabled watchlist entry, resolved to what the digest cycle needs"""
+    chat_identifier: Any
+    max_messages: int
+    is_channel: bool
+
+
+def _resolve_active_chats(watchlist: Dict[str, Any]) -> tuple:
+    """Return the enabled channels then chats from the watchlist as ChatSpecs"""
+    watchlist_config = (watchlist or {}).get('watchlist', {})
+    specs = []
+    
+    # Channels
+    for channel_config in watchlist_config.get('channels', []):
+        if not channel_config.get('enabled', True):
+            continue
+        specs.append(ChatSpec(channel_config['name'], channel_config.get('max_messages', 100), True))
+    
+    # Private chats
+    for chat_config in watchlist_config.get('chats', []):
+        if not chat_config.get('enabled', True):
+            continue
+        
+        chat_identifier = chat_config.get('chat_id') or chat_config.get('name')
+        if not chat_identifier:
+            continue
+        specs.append(ChatSpec(chat_identifier, chat_config.get('max_messages', 100), False))
+    
+    return tuple(specs)
+
+
+# Watchdog event types that can change file contents; "opened" and "closed_no_write" come
+# from reads, including the bot's own, and must not wake the reload check
+_CONFIG_WRITE_EVENT_TYPES = frozenset({"modified", "created", "moved", "closed"})
+
+
+class _ConfigFileHandler(FileSystemEventHandler):
+    """Watchdog handler that signals the bot when a config file changes"""
+    
+    def __init__(self, paths, loop: asyncio.AbstractEventLoop, event: asyncio.Event):
+        super().__init__()
+        self.paths = {os.path.abspath(p) for p in paths}
+        self.loop = loop
+        self.event = event
+    
+    def on_any_event(self, event):
+        if event.event_type not in _CONFIG_WRITE_EVENT_TYPES:
+            return
+        # Editors often save via rename, so check the destination path too
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path and os.path.abspath(path) in self.paths:
+                self.loop.call_soon_threadsafe(self.event.set)
+                return
+
 
 class TelegramDigestBot:
     """Main bot application"""
@@ -41,35 +282,65 @@ class TelegramDigestBot:
         self.watchlist_path = watchlist_path
         self.config = None
         self.watchlist = None
+        self.settings = Settings()
+        self.active_chats: tuple = ()
         
         # Components
         self.telegram_client = None
         self.message_processor = None
         self.digest_generator = None
         self.storage = None
+        self.send_limiter = None
         
         # Runtime state
         self.running = False
         self.last_config_load = None
+        self._config_mtime = None
+        self._watchlist_mtime = None
+        self._config_hash = None
+        self._reload_event = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._observer = None
+        self._last_config_poll = 0.0
+        self._prompt_cache: Optional[tuple] = None  # (mtime, prompt text)
+        self._last_cleanup = None
+        self._log_listener = None
+        atexit.register(self._stop_log_listener)
         
         logger.info("Telegram Digest Bot initialized")
     
-    def load_config(self) -> bool:
+    async def load_config(self) -> bool:
+        """Load configuration files without blocking the event loop"""
+        return await asyncio.to_thread(self._load_config_sync)
+    
+    def _load_config_sync(self) -> bool:
         """Load configuration files"""
         try:
+            # Fingerprint the files before parsing: if they change mid-load, the recorded
+            # state is older than the data and the next check reloads, never the reverse
+            config_stat = os.stat(self.config_path)
+            watchlist_stat = os.stat(self.watchlist_path)
+            config_hash = self._hash_config_files()
+            
             # Load main config
-            with open(self.config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = load_yaml(self.config_path, config_stat)
             
             # Load watchlist
-            with open(self.watchlist_path, 'r') as f:
-                self.watchlist = yaml.safe_load(f)
+            self.watchlist = load_yaml(self.watchlist_path, watchlist_stat)
+            
+            self.settings = Settings.from_config(self.config)
+            self.active_chats = _resolve_active_chats(self.watchlist)
             
             # Configure logging based on config
             self._setup_logging()
             
-            self.last_config_load = datetime.now()
-            logger.info("Configuration loaded successfully")
+            # Remember what we loaded so unchanged files can be skipped on reload
+            self._config_mtime = config_stat.st_mtime
+            self._watchlist_mtime = watchlist_stat.st_mtime
+            self._config_hash = config_hash
+            
+            self.last_config_load = time.time()
+            logger.info("Configuration loaded successfully (YAML loader: %s)", get_safe_loader().__name__)
             return True
             
         except Exception as e:
@@ -83,6 +354,7 @@ class TelegramDigestBot:
             log_level = getattr(logging, log_config.get('level', 'INFO').upper())
             
             # Clear existing handlers
+            self._stop_log_listener()
             root_logger = logging.getLogger()
             for handler in root_logger.handlers[:]:
                 root_logger.removeHandler(handler)
@@ -90,12 +362,10 @@ class TelegramDigestBot:
             # Create formatter
             formatter = logging.Formatter(log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
             
-            # Add file handler if enabled
+            # Add file handler if enabled - writes happen on a listener thread
+            # so logging from coroutines never blocks the event loop on disk I/O
             if log_config.get('file_logging', True):
-                file_handler = logging.FileHandler('digest_bot.log')
-                file_handler.setFormatter(formatter)
-                file_handler.setLevel(log_level)
-                root_logger.addHandler(file_handler)
+                self._start_file_logging(formatter, log_level)
             
             # Add console handler if enabled
             if log_config.get('console_logging', True):
@@ -107,34 +377,94 @@ class TelegramDigestBot:
             # Set root logger level
             root_logger.setLevel(log_level)
             
-            logger.info(f"Logging configured: level={log_config.get('level', 'INFO')}, file={log_config.get('file_logging', True)}, console={log_config.get('console_logging', True)}")
+            logger.info(
+                "Logging configured: level=%s, file=%s, console=%s",
+                log_config.get('level', 'INFO'),
+                log_config.get('file_logging', True),
+                log_config.get('console_logging', True)
+            )
             
         except Exception as e:
             # Fallback to basic logging if config fails
             logging.basicConfig(
                 level=logging.INFO,
                 format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                handlers=[
-                    logging.FileHandler('digest_bot.log'),
-                    logging.StreamHandler(sys.stdout)
-                ]
+                handlers=[logging.StreamHandler(sys.stdout)]
             )
-            logger.warning(f"Failed to configure logging from config, using fallback: {e}")
+            if not self._log_listener:
+                self._start_file_logging(
+                    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'), logging.INFO
+                )
+            logger.warning("Failed to configure logging from config, using fallback: %s", e)
     
-    def should_reload_config(self) -> bool:
-        """Check if config should be reloaded (hot reload)"""
+    def _start_file_logging(self, formatter: logging.Formatter, log_level: int):
+        """Route root logging to digest_bot.log through a queue drained by a listener thread"""
+        file_handler = logging.FileHandler('digest_bot.log')
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(log_level)
+        
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(log_level)
+        logging.getLogger().addHandler(queue_handler)
+        
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+    
+    def _stop_log_listener(self):
+        """Flush and stop the background file logging thread"""
+        if self._log_listener:
+            self._log_listener.stop()
+            for handler in self._log_listener.handlers:
+                handler.close()
+            self._log_listener = None
+    
+    def _hash_config_files(self) -> str:
+        """Return a SHA-256 fingerprint of the config and watchlist contents"""
+        digest = hashlib.sha256()
+        for path in (self.config_path, self.watchlist_path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+    
+    def should_reload_config(self, file_event: bool = False) -> bool:
+        """Check if config should be reloaded (hot reload).
+        While the file watcher is running, files are only stat'ed after a watcher
+        event or every few minutes as a fallback for filesystems without inotify."""
         if not self.last_config_load:
             return True
         
+        now = time.monotonic()
+        if (self._observer and not file_event and
+                now - self._last_config_poll < CONFIG_POLL_FALLBACK_SECONDS):
+            return False
+        self._last_config_poll = now
+        
         try:
             config_mtime = os.path.getmtime(self.config_path)
             watchlist_mtime = os.path.getmtime(self.watchlist_path)
             
-            config_time = datetime.fromtimestamp(config_mtime)
-            watchlist_time = datetime.fromtimestamp(watchlist_mtime)
+            if (config_mtime == self._config_mtime and
+                    watchlist_mtime == self._watchlist_mtime):
+                return False
+            
+            # mtime changed - only reload if the content actually changed
+            config_hash = self._hash_config_files()
+            if config_hash == self._config_hash:
+                self._config_mtime = config_mtime
+                self._watchlist_mtime = watchlist_mtime
+                logger.debug("Config files touched but content unchanged, skipping reload")
+                return False
+            
+            # Editors may truncate then write, so only reload once the content is stable
+            time.sleep(CONFIG_SETTLE_SECONDS)
+            if self._hash_config_files() != config_hash:
+                logger.debug("Config files still being written, deferring reload")
+                return False
             
-            return (config_time > self.last_config_load or 
-                    watchlist_time > self.last_config_load)
+            return True
                     
         except Exception as e:
             logger.error(f"Error checking config file times: {e}")
@@ -151,6 +481,7 @@ class TelegramDigestBot:
             self.telegram_client = TelegramDigestClient(telegram_config)
             await self.telegram_client.connect()
             self.telegram_client.load_watchlist(self.watchlist_path)
+            self.send_limiter = RateLimiter.from_config(telegram_config.get('rate_limit', {}))
             
             # Initialize message processor
             digest_config = self.config.get('digest', {})
@@ -159,8 +490,8 @@ class TelegramDigestBot:
             # Initialize digest generator
             self.digest_generator = DigestGenerator(self.config)
             
-            # Validate LLM configuration
-            if not self.digest_generator.llm_manager.validate_config():
+            # Validate LLM configuration (blocking test request, so run it off the event loop)
+            if not await asyncio.to_thread(self.digest_generator.llm_manager.validate_config):
                 logger.error("LLM configuration validation failed")
                 return False
             
@@ -171,70 +502,116 @@ class TelegramDigestBot:
             logger.error(f"Failed to initialize components: {e}")
             return False
     
+    def _start_config_watcher(self):
+        """Start a watchdog observer that wakes the bot when config files change"""
+        if Observer is None:
+            logger.info("watchdog not installed, using mtime polling for config reload")
+            return
+        
+        try:
+            handler = _ConfigFileHandler(
+                (self.config_path, self.watchlist_path),
+                asyncio.get_running_loop(),
+                self._reload_event
+            )
+            self._observer = Observer()
+            watch_dirs = {os.path.dirname(os.path.abspath(p)) for p in (self.config_path, self.watchlist_path)}
+            for watch_dir in watch_dirs:
+                self._observer.schedule(handler, watch_dir, recursive=False)
+            self._observer.start()
+            logger.info("Watching config files for changes in: %s", ', '.join(sorted(watch_dirs)))
+        except Exception as e:
+            logger.warning("Failed to start config watcher, using mtime polling: %s", e)
+            self._observer = None
+    
+    def _stop_config_watcher(self):
+        """Stop the watchdog observer if running"""
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+    
     async def run_digest_cycle(self) -> bool:
         """Run a single digest generation cycle"""
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             logger.info("Starting digest cycle")
             
             # Calculate cutoff time for server-side filtering
-            from datetime import datetime, timedelta, timezone
-            digest_config = self.config.get('digest', {})
-            lookback_hours = digest_config.get('lookback_hours', 72)
-            local_cutoff = datetime.now().astimezone() - timedelta(hours=lookback_hours)
-            cutoff_time = local_cutoff.astimezone(timezone.utc)
-            logger.info(f"Lookback filter: {lookback_hours} hours ago = {cutoff_time} UTC (local: {local_cutoff})")
+            lookback_hours = self.settings.lookback_hours
+            cycle_now = datetime.now()
+            cutoff_time = datetime.now(_UTC) - timedelta(hours=lookback_hours)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Lookback filter: %s hours ago = %s UTC (local: %s)",
+                            lookback_hours, cutoff_time, cutoff_time.astimezone())
+            
+            # Timestamps are formatted once per cycle and shared by every chat
+            now_iso = cycle_now.isoformat()
+            now_fmt = cycle_now.strftime('%Y-%m-%d %H:%M')
             
             # Process each chat individually
             username = None  # TODO: Get username from Telegram client
-            system_prompt = self.load_system_prompt()
-            all_chat_summaries = []
+            system_prompt = await asyncio.to_thread(self.load_system_prompt)
             
-            # Get watchlist for individual processing
-            watchlist_config = self.telegram_client.watchlist.get('watchlist', {})
+            # Active watchlist entries are resolved once per config load
+            chat_jobs = self.active_chats
             
-            # Process channels
-            for channel_config in watchlist_config.get('channels', []):
-                if not channel_config.get('enabled', True):
-                    continue
-                    
-                chat_summary = await self._process_single_chat(
-                    channel_config['name'], 
-                    channel_config.get('max_messages', 100),
-                    cutoff_time, 
-                    username, 
-                    system_prompt,
-                    is_channel=True
-                )
-                if chat_summary:
-                    all_chat_summaries.append(chat_summary)
+            # Process chats concurrently, bounded to stay within Telegram/LLM rate limits
+            semaphore = asyncio.Semaphore(self.settings.max_concurrent_chats)
             
-            # Process private chats
-            for chat_config in watchlist_config.get('chats', []):
-                if not chat_config.get('enabled', True):
-                    continue
+            async def process_chat(spec: ChatSpec):
+                async with semaphore:
+                    return await self._process_single_chat(
+                        spec.chat_identifier,
+                        spec.max_messages,
+                        cutoff_time,
+                        username,
+                        system_prompt,
+                        is_channel=spec.is_channel,
+                        now_iso=now_iso
+                    )
+            
+            tasks = [asyncio.ensure_future(process_chat(spec)) for spec in chat_jobs]
+            
+            # Fetch, filter and digest run concurrently, but results are consumed in watchlist
+            # order so each chat's messages reach Saved Messages contiguously and in order
+            all_chat_summaries = []
+            total_messages = 0
+            total_filtered = 0
+            try:
+                for spec, task in zip(chat_jobs, tasks):
+                    try:
+                        result = await task
+                    except Exception as e:
+                        logger.error(f"Error processing {spec.chat_identifier}: {e}")
+                        continue
+                    if not result:
+                        continue
                     
-                chat_identifier = chat_config.get('chat_id') or chat_config.get('name')
-                if not chat_identifier:
-                    continue
+                    summary, digest_result = result
+                    if self.settings.send_to_saved_messages:
+                        try:
+                            await self.send_digest_to_telegram(digest_result, {
+                                "chat_name": summary["chat_name"],
+                                "message_count": summary["message_count"],
+                                "filtered_message_count": summary["filtered_message_count"]
+                            }, now_fmt)
+                        except Exception as e:
+                            logger.error(f"Error sending digest for {spec.chat_identifier}: {e}")
                     
-                chat_summary = await self._process_single_chat(
-                    chat_identifier, 
-                    chat_config.get('max_messages', 100),
-                    cutoff_time, 
-                    username, 
-                    system_prompt,
-                    is_channel=False
-                )
-                if chat_summary:
-                    all_chat_summaries.append(chat_summary)
+                    all_chat_summaries.append(summary)
+                    total_messages += summary["message_count"]
+                    total_filtered += summary["filtered_message_count"]
+            finally:
+                for task in tasks:
+                    task.cancel()
             
             # Create final JSON summary of all chats
             if all_chat_summaries:
-                await self._create_final_summary(all_chat_summaries)
-                processing_time = time.time() - start_time
-                logger.info(f"Processed {len(all_chat_summaries)} chats successfully in {processing_time:.2f} seconds")
+                await self._create_final_summary(all_chat_summaries, now_iso, total_messages, total_filtered)
+                processing_time = time.monotonic() - start_time
+                logger.info("Processed %d chats successfully in %.2f seconds", len(all_chat_summaries), processing_time)
             else:
                 logger.info("No chats had messages to process")
             
@@ -244,10 +621,12 @@ class TelegramDigestBot:
             logger.error(f"Error during digest cycle: {e}")
             return False
     
-    async def _process_single_chat(self, chat_identifier: str, max_messages: int, cutoff_time, username: str, system_prompt: str, is_channel: bool) -> dict:
-        """Process a single chat: retrieve, filter, generate digest, send to Saved Messages"""
+    async def _process_single_chat(self, chat_identifier: str, max_messages: int, cutoff_time, username: str, system_prompt: str, is_channel: bool,
+                                   now_iso: str) -> Optional[tuple]:
+        """Process a single chat: retrieve, filter and generate its digest.
+        Returns (summary for the final JSON, digest result to send), or None if there is nothing to send."""
         try:
-            logger.info(f"Processing {'channel' if is_channel else 'chat'}: {chat_identifier}")
+            logger.info("Processing %s: %s", 'channel' if is_channel else 'chat', chat_identifier)
             
             # Retrieve messages for this chat
             messages = await self.telegram_client.get_chat_messages(
@@ -257,14 +636,14 @@ class TelegramDigestBot:
             )
             
             if not messages:
-                logger.info(f"No messages found for {chat_identifier}")
+                logger.info("No messages found for %s", chat_identifier)
                 return None
             
             # Filter messages
             filtered_messages = self.message_processor.filter_messages(messages, username)
             
             if not filtered_messages:
-                logger.info(f"No relevant messages found for {chat_identifier}")
+                logger.info("No relevant messages found for %s", chat_identifier)
                 return None
             
             # Generate digest
@@ -278,56 +657,59 @@ class TelegramDigestBot:
                 logger.error(f"Failed to generate digest for {chat_identifier}: {digest_result.error_message}")
                 return None
             
-            # Send to Saved Messages
-            if self.config.get('output', {}).get('send_to_saved_messages', True):
-                await self.send_digest_to_telegram(digest_result, {
-                    "chat_name": chat_identifier,
-                    "message_count": len(messages),
-                    "filtered_message_count": len(filtered_messages)
-                })
-            
-            # Return summary for final JSON
-            return {
+            # Return summary for final JSON; the caller sends the digest in watchlist order
+            summary = {
                 "chat_name": chat_identifier,
                 "is_channel": is_channel,
                 "message_count": len(messages),
                 "filtered_message_count": len(filtered_messages),
                 "digest": digest_result.structured_data,
-                "processed_at": datetime.now().isoformat()
+                "processed_at": now_iso
             }
+            return summary, digest_result
             
         except Exception as e:
             logger.error(f"Error processing {chat_identifier}: {e}")
             return None
     
-    async def _create_final_summary(self, all_chat_summaries: list):
+    async def _create_final_summary(self, all_chat_summaries: list, generated_at: str,
+                                    total_messages: int, total_filtered: int):
         """Create and save final JSON summary of all processed chats"""
         try:
             summary_data = {
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": generated_at,
                 "total_chats_processed": len(all_chat_summaries),
-                "total_messages": sum(chat["message_count"] for chat in all_chat_summaries),
-                "total_filtered_messages": sum(chat["filtered_message_count"] for chat in all_chat_summaries),
+                "total_messages": total_messages,
+                "total_filtered_messages": total_filtered,
                 "chats": all_chat_summaries
             }
             
-            # Save to storage
-            self.storage.save_last_digest(summary_data)
+            # Save to storage and export JSON concurrently - the sinks are independent
+            sinks = {"save_last_digest": asyncio.to_thread(self.storage.save_last_digest, summary_data)}
+            if self.settings.include_json_attachment:
+                sinks["export_digest_json"] = asyncio.to_thread(self.storage.export_digest_json, summary_data)
             
-            # Export JSON if configured
-            if self.config.get('output', {}).get('include_json_attachment', True):
-                json_path = self.storage.export_digest_json(summary_data)
-                logger.info(f"Final digest summary JSON exported to {json_path}")
+            results = await asyncio.gather(*sinks.values(), return_exceptions=True)
+            for sink_name, result in zip(sinks, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to {sink_name.replace('_', ' ')}: {result}")
+                elif sink_name == "export_digest_json":
+                    logger.info("Final digest summary JSON exported to %s", result)
             
         except Exception as e:
             logger.error(f"Error creating final summary: {e}")
     
     def load_system_prompt(self) -> str:
-        """Load system prompt from file"""
+        """Load system prompt from file (blocking; run_digest_cycle calls it via asyncio.to_thread)"""
         try:
             prompt_file = Path("prompts/digest_system.txt")
-            with open(prompt_file, 'r') as f:
-                return f.read().strip()
+            mtime = os.stat(prompt_file).st_mtime
+            if self._prompt_cache and self._prompt_cache[0] == mtime:
+                return self._prompt_cache[1]
+            
+            prompt = prompt_file.read_text().strip()
+            self._prompt_cache = (mtime, prompt)
+            return prompt
         except Exception as e:
             logger.error(f"Failed to load system prompt: {e}")
             # Return a basic fallback prompt
@@ -341,250 +723,247 @@ class TelegramDigestBot:
   "unanswered_mentions": []
 }"""
     
-    async def send_digest_to_telegram(self, digest_result, digest_data: Dict[str, Any]):
+    async def send_digest_to_telegram(self, digest_result, digest_data: Dict[str, Any], now_fmt: Optional[str] = None):
         """Send digest to Telegram Saved Messages as individual chat messages"""
         try:
             # Get the chat digests from the metadata
-            metadata = digest_result.metadata or {}
-            chat_details = metadata.get('chat_details', {})
+            metadata = DigestMetadata.from_dict(digest_result.metadata)
             
-            if not chat_details:
+            if not metadata.chat_details:
                 # Fallback: send as single message if no chat details
-                message_text = digest_result.digest_text
-                footer = f"\n\n📊 **Stats**: {metadata.get('message_count', 0)} messages from {metadata.get('chat_count', 0)} chats"
-                if metadata.get('validation_errors'):
-                    footer += f" ⚠️ {len(metadata['validation_errors'])} validation warnings"
-                message_text += footer
-                
-                await self.telegram_client.send_to_saved_messages(message_text)
+                footer = self._build_footer(metadata)
+                await self._send_to_saved_messages(digest_result.digest_text, footer)
                 logger.info("Digest sent to Telegram Saved Messages (single message)")
                 return
             
-            # Send individual chat digests
+            # Split the combined structured data by chat once, rather than rescanning it per chat
+            chat_buckets = _bucketize_by_chat(digest_result.structured_data, metadata.chat_details)
+            now_fmt = now_fmt or datetime.now().strftime('%Y-%m-%d %H:%M')
+            
+            # Send individual chat digests one at a time so each chat's chunks stay contiguous;
+            # everything goes to one chat, so the send limiter alone sets the pace
             total_sent = 0
-            for chat_name, chat_data in chat_details.items():
+            for chat_name, buckets in chat_buckets.items():
                 try:
                     # Generate individual chat digest text
-                    chat_digest_text = self._format_single_chat_digest(
-                        chat_name, 
-                        chat_data, 
-                        digest_result.structured_data,
-                        metadata
-                    )
+                    chat_digest_text = self._format_single_chat_digest(chat_name, buckets, now_fmt)
                     
                     if chat_digest_text.strip():
-                        await self.telegram_client.send_to_saved_messages(chat_digest_text)
+                        await self._send_to_saved_messages(chat_digest_text)
                         total_sent += 1
-                        logger.info(f"Sent digest for chat: {chat_name}")
-                        
-                        # Small delay between messages to avoid rate limiting
-                        await asyncio.sleep(1)
+                        logger.info("Sent digest for chat: %s", chat_name)
                     
                 except Exception as e:
                     logger.error(f"Failed to send digest for chat {chat_name}: {e}")
             
             # Send summary message
             summary_text = self._format_digest_summary(metadata, total_sent)
-            await self.telegram_client.send_to_saved_messages(summary_text)
+            await self._send_to_saved_messages(summary_text)
             
-            logger.info(f"Successfully sent {total_sent} individual chat digests + summary to Telegram Saved Messages")
+            logger.info("Successfully sent %d individual chat digests + summary to Telegram Saved Messages", total_sent)
             
         except Exception as e:
             logger.error(f"Failed to send digest to Telegram: {e}")
             raise
     
-    def _format_single_chat_digest(self, chat_name: str, chat_data: Dict[str, Any], 
-                                  structured_data: Dict[str, Any], metadata: Dict[str, Any]) -> str:
-        """Format digest for a single chat using the actual structured data"""
-        # Extract chat-specific data from the combined structured_data
-        # The structured_data contains all chats combined, so we need to filter by source_chat
-        chat_structured_data = {
-            "urgent": [],
-            "decisions": [],
-            "topics": [],
-            "people_updates": [],
-            "calendar": [],
-            "unanswered_mentions": []
-        }
-        
-        # Filter urgent items for this chat
-        if structured_data.get("urgent"):
-            for item in structured_data["urgent"]:
-                if f"[{chat_name}]" in item:
-                    # Remove the chat prefix for display
-                    clean_item = item.replace(f"[{chat_name}] ", "")
-                    chat_structured_data["urgent"].append(clean_item)
-        
-        # Filter decisions for this chat
-        if structured_data.get("decisions"):
-            for decision in structured_data["decisions"]:
-                if f"[{chat_name}]" in decision:
-                    clean_decision = decision.replace(f"[{chat_name}] ", "")
-                    chat_structured_data["decisions"].append(clean_decision)
-        
-        # Filter topics for this chat
-        if structured_data.get("topics"):
-            for topic in structured_data["topics"]:
-                if topic.get("source_chat") == chat_name:
-                    # Remove source_chat for display
-                    topic_copy = topic.copy()
-                    topic_copy.pop("source_chat", None)
-                    chat_structured_data["topics"].append(topic_copy)
-        
-        # Filter people updates for this chat
-        if structured_data.get("people_updates"):
-            for update in structured_data["people_updates"]:
-                if update.get("source_chat") == chat_name:
-                    # Remove source_chat for display
-                    update_copy = update.copy()
-                    update_copy.pop("source_chat", None)
-                    chat_structured_data["people_updates"].append(update_copy)
-        
-        # Filter calendar events for this chat
-        if structured_data.get("calendar"):
-            for event in structured_data["calendar"]:
-                if event.get("source_chat") == chat_name:
-                    # Remove source_chat for display
-                    event_copy = event.copy()
-                    event_copy.pop("source_chat", None)
-                    chat_structured_data["calendar"].append(event_copy)
-        
-        # Filter unanswered mentions for this chat
-        if structured_data.get("unanswered_mentions"):
-            for mention in structured_data["unanswered_mentions"]:
-                if f"[{chat_name}]" in mention:
-                    clean_mention = mention.replace(f"[{chat_name}] ", "")
-                    chat_structured_data["unanswered_mentions"].append(clean_mention)
+    def _build_footer(self, metadata: DigestMetadata) -> str:
+        """Build the stats footer appended to a single-message digest"""
+        footer = _STATS_FOOTER.format(
+            message_count=metadata.message_count,
+            chat_count=metadata.chat_count
+        )
+        if metadata.validation_errors:
+            footer += _VALIDATION_FOOTER.format(count=len(metadata.validation_errors))
+        return footer
+    
+    async def _send_to_saved_messages(self, text: str, footer: str = ""):
+        """Send text to Saved Messages in rate-limited chunks, backing off on flood waits.
+        The footer is appended to the last chunk only."""
+        chunks = _split_message(text, MAX_MESSAGE_LENGTH - len(footer))
+        if footer:
+            chunks = chunks or [""]
+            chunks[-1] += footer
         
-        # Create header
-        header = f"📱 **{chat_name}** Digest\n"
-        header += f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-        header += f"💬 {chat_data.get('message_count', 0)} messages\n"
-        header += "=" * 50 + "\n\n"
+        for chunk in chunks:
+            for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+                await self.send_limiter.acquire()
+                try:
+                    await self.telegram_client.send_to_saved_messages(chunk)
+                    break
+                except FloodWaitError as e:
+                    if attempt == MAX_SEND_ATTEMPTS:
+                        raise
+                    logger.warning("Telegram flood wait of %s seconds, pausing all sends", e.seconds)
+                    self.send_limiter.pause(e.seconds)
+    
+    def _format_single_chat_digest(self, chat_name: str, buckets: ChatBuckets, now_fmt: str) -> str:
+        """Format digest for a single chat from its bucket of the structured data"""
+        buf = io.StringIO()
+        w = buf.write
         
-        sections = []
+        # Create header
+        w(f"📱 **{chat_name}** Digest\n📅 {now_fmt}\n💬 {buckets.message_count} messages\n")
+        w(_HEADER_RULE)
         
         # Add validation errors if any
-        validation_errors = chat_data.get('validation_errors', [])
-        if validation_errors:
-            sections.append("⚠️ **Validation Issues:**")
-            for error in validation_errors:
-                sections.append(f"• {error}")
-            sections.append("")
+        if buckets.validation_errors:
+            w("⚠️ **Validation Issues:**\n")
+            for error in buckets.validation_errors:
+                w(_BULLET_FMT(error))
+            w("\n")
         
         # Check if this chat has any significant content
-        has_content = any([
-            chat_structured_data.get("urgent"),
-            chat_structured_data.get("decisions"),
-            chat_structured_data.get("topics"),
-            chat_structured_data.get("people_updates"),
-            chat_structured_data.get("calendar"),
-            chat_structured_data.get("unanswered_mentions")
-        ])
-        
-        if not has_content:
-            sections.append("💤 **No significant updates in this chat**")
-            sections.append("This chat had messages but no actionable content was identified.")
-        else:
-            # Add urgent items
-            if chat_structured_data.get("urgent"):
-                sections.append("🚨 **URGENT ITEMS**")
-                for item in chat_structured_data["urgent"]:
-                    sections.append(f"• {item}")
-                sections.append("")
-            
-            # Add unanswered mentions
-            if chat_structured_data.get("unanswered_mentions"):
-                sections.append("💬 **REQUIRES YOUR RESPONSE**")
-                for mention in chat_structured_data["unanswered_mentions"]:
-                    sections.append(f"• {mention}")
-                sections.append("")
-            
-            # Add calendar events
-            if chat_structured_data.get("calendar"):
-                sections.append("📅 **CALENDAR & DEADLINES**")
-                for event in chat_structured_data["calendar"]:
-                    time_str = f" at {event['time']}" if event.get("time") else ""
-                    sections.append(f"• {event['event']} - {event['date']}{time_str}")
-                sections.append("")
-            
-            # Add decisions
-            if chat_structured_data.get("decisions"):
-                sections.append("✅ **DECISIONS MADE**")
-                for decision in chat_structured_data["decisions"]:
-                    sections.append(f"• {decision}")
-                sections.append("")
-            
-            # Add topics
-            if chat_structured_data.get("topics"):
-                sections.append("💡 **KEY TOPICS DISCUSSED**")
-                for topic in chat_structured_data["topics"]:
-                    participants = ""
-                    if topic.get("participants"):
-                        participants = f" (👥 {', '.join(topic['participants'])})"
-                    sections.append(f"• **{topic['topic']}**{participants}")
-                    sections.append(f"  {topic['summary']}")
-                sections.append("")
-            
-            # Add people updates
-            if chat_structured_data.get("people_updates"):
-                sections.append("👥 **PEOPLE UPDATES**")
-                for update in chat_structured_data["people_updates"]:
-                    sections.append(f"• **{update['person']}**: {update['update']}")
-                sections.append("")
-        
-        return header + "\n".join(sections)
-    
-    def _format_digest_summary(self, metadata: Dict[str, Any], total_sent: int) -> str:
+        if not (buckets.urgent or buckets.decisions or buckets.topics or buckets.people_updates
+                or buckets.calendar or buckets.unanswered_mentions):
+            w("💤 **No significant updates in this chat**\n")
+            w("This chat had messages but no actionable content was identified.\n")
+            return buf.getvalue()
+        
+        # Add urgent items
+        if buckets.urgent:
+            w("🚨 **URGENT ITEMS**\n")
+            for item in buckets.urgent:
+                w(_BULLET_FMT(item))
+            w("\n")
+        
+        # Add unanswered mentions
+        if buckets.unanswered_mentions:
+            w("💬 **REQUIRES YOUR RESPONSE**\n")
+            for mention in buckets.unanswered_mentions:
+                w(_BULLET_FMT(mention))
+            w("\n")
+        
+        # Add calendar events
+        if buckets.calendar:
+            w("📅 **CALENDAR & DEADLINES**\n")
+            for event in buckets.calendar:
+                time_str = f" at {event['time']}" if event.get("time") else ""
+                w(_CALENDAR_FMT(event=event['event'], date=event['date'], time=time_str))
+            w("\n")
+        
+        # Add decisions
+        if buckets.decisions:
+            w("✅ **DECISIONS MADE**\n")
+            for decision in buckets.decisions:
+                w(_BULLET_FMT(decision))
+            w("\n")
+        
+        # Add topics
+        if buckets.topics:
+            w("💡 **KEY TOPICS DISCUSSED**\n")
+            for topic in buckets.topics:
+                participants = ""
+                if topic.get("participants"):
+                    participants = f" (👥 {', '.join(topic['participants'])})"
+                w(_TOPIC_FMT(topic=topic['topic'], participants=participants, summary=topic['summary']))
+            w("\n")
+        
+        # Add people updates
+        if buckets.people_updates:
+            w("👥 **PEOPLE UPDATES**\n")
+            for update in buckets.people_updates:
+                w(_PERSON_FMT(person=update['person'], update=update['update']))
+            w("\n")
+        
+        return buf.getvalue()
+    
+    def _format_digest_summary(self, metadata: DigestMetadata, total_sent: int) -> str:
         """Format summary message for all digests"""
         summary = "📊 **Digest Summary**\n"
         summary += "=" * 30 + "\n\n"
         
-        summary += f"📱 **Total Chats Processed:** {metadata.get('chat_count', 0)}\n"
-        summary += f"💬 **Total Messages:** {metadata.get('message_count', 0)}\n"
+        summary += f"📱 **Total Chats Processed:** {metadata.chat_count}\n"
+        summary += f"💬 **Total Messages:** {metadata.message_count}\n"
         summary += f"📤 **Digests Sent:** {total_sent}\n"
         
-        if metadata.get('validation_errors'):
-            summary += f"⚠️ **Validation Warnings:** {len(metadata['validation_errors'])}\n"
+        if metadata.validation_errors:
+            summary += f"⚠️ **Validation Warnings:** {len(metadata.validation_errors)}\n"
         
-        summary += f"\n🕐 **Generated:** {metadata.get('generated_at', 'Unknown')}\n"
-        summary += f"🤖 **LLM Provider:** {metadata.get('llm_provider', 'Unknown')}\n"
+        summary += f"\n🕐 **Generated:** {metadata.generated_at}\n"
+        summary += f"🤖 **LLM Provider:** {metadata.llm_provider}\n"
         
         return summary
     
+    async def _reload_config_if_changed(self, file_event: bool = False) -> bool:
+        """Reload configuration and reinitialize components if files changed.
+        Returns True if the reload changed the runtime settings."""
+        # Consume a pending watcher event here, right before the files are checked, so an
+        # event that fires after this point sets the flag again and is not lost
+        if self._reload_event.is_set():
+            self._reload_event.clear()
+            file_event = True
+        
+        if not await asyncio.to_thread(self.should_reload_config, file_event):
+            return False
+        
+        logger.info("Configuration files changed, reloading...")
+        previous_config, previous_watchlist = self.config, self.watchlist
+        previous_settings = self.settings
+        if await self.load_config():
+            # Reinitialize components only if the parsed config differs
+            if self.config != previous_config or self.watchlist != previous_watchlist:
+                await self.cleanup()
+                await self.initialize_components()
+            else:
+                logger.info("Configuration content unchanged, keeping components")
+            return self.settings != previous_settings
+        
+        logger.error("Failed to reload configuration")
+        return False
+    
+    async def _wait_for_stop_or_reload(self, timeout: float) -> bool:
+        """Wait until stop is requested, a config change is reported, or timeout elapses.
+        Returns True if woken by a config change; the event is left set for
+        _reload_config_if_changed to consume."""
+        stop_wait = asyncio.ensure_future(self._stop_event.wait())
+        reload_wait = asyncio.ensure_future(self._reload_event.wait())
+        try:
+            await asyncio.wait({stop_wait, reload_wait}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_wait.cancel()
+            reload_wait.cancel()
+        
+        return not self._stop_event.is_set() and self._reload_event.is_set()
+    
     async def run_continuous(self):
         """Run the bot in continuous mode"""
         self.running = True
-        interval_minutes = self.config.get('digest', {}).get('interval_minutes', 240)
         
-        logger.info(f"Starting continuous mode with {interval_minutes} minute intervals")
+        logger.info("Starting continuous mode with %s minute intervals", self.settings.interval_minutes)
+        
+        self._start_config_watcher()
         
         while self.running:
             try:
                 # Check for config changes and reload if needed
-                if self.should_reload_config():
-                    logger.info("Configuration files changed, reloading...")
-                    if self.load_config():
-                        # Reinitialize components with new config
-                        await self.cleanup()
-                        await self.initialize_components()
-                    else:
-                        logger.error("Failed to reload configuration")
+                # (mtime polling also covers filesystems where watchdog events don't fire)
+                await self._reload_config_if_changed()
                 
                 # Run digest cycle
+                cycle_started = time.monotonic()
                 await self.run_digest_cycle()
                 
-                # Clean up old backups periodically
-                self.storage.cleanup_old_backups()
+                # Clean up old backups at most once a day
+                now = time.monotonic()
+                if self._last_cleanup is None or now - self._last_cleanup > BACKUP_CLEANUP_INTERVAL_SECONDS:
+                    await asyncio.to_thread(self.storage.cleanup_old_backups)
+                    self._last_cleanup = now
                 
-                # Wait for next cycle
-                logger.info(f"Waiting {interval_minutes} minutes until next cycle...")
+                # Wait for next cycle; cycles are spaced interval_minutes apart, start to start
+                logger.info("Waiting until %s minutes after this cycle started...", self.settings.interval_minutes)
                 
-                # Sleep in smaller increments to allow for graceful shutdown
-                sleep_seconds = interval_minutes * 60
-                while sleep_seconds > 0 and self.running:
-                    await asyncio.sleep(min(60, sleep_seconds))  # Check every minute
-                    sleep_seconds -= 60
+                # Sleep until the next cycle, waking early on stop requests
+                # or config changes reported by the watcher
+                deadline = cycle_started + self.settings.interval_minutes * 60
+                while self.running:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    # Wake at least every few minutes for the mtime fallback poll
+                    file_event = await self._wait_for_stop_or_reload(min(remaining, CONFIG_POLL_FALLBACK_SECONDS))
+                    if self.running and await self._reload_config_if_changed(file_event):
+                        # A reloaded interval applies to the wait already in progress
+                        deadline = cycle_started + self.settings.interval_minutes * 60
                     
             except KeyboardInterrupt:
                 logger.info("Received interrupt signal, stopping...")
@@ -592,8 +971,12 @@ class TelegramDigestBot:
             except Exception as e:
                 logger.error(f"Error in continuous mode: {e}")
                 # Wait a bit before retrying
-                await asyncio.sleep(60)
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=60)
+                except asyncio.TimeoutError:
+                    pass
         
+        self._stop_config_watcher()
         self.running = False
         logger.info("Continuous mode stopped")
     
@@ -625,75 +1008,111 @@ class TelegramDigestBot:
     def stop(self):
         """Stop the bot"""
         self.running = False
+        self._stop_event.set()
         logger.info("Bot stop requested")
 
 
-async def main():
-    """Main entry point"""
-    parser = argparse.ArgumentParser(description="Telegram Digest Bot")
-    parser.add_argument("--once", action="store_true", help="Run once and exit")
-    parser.add_argument("--config", default="config.yaml", help="Configuration file path")
-    parser.add_argument("--watchlist", default="watchlist.yml", help="Watchlist file path") 
-    parser.add_argument("--stats", action="store_true", help="Show storage statistics")
-    parser.add_argument("--reset-cursors", nargs="*", help="Reset cursors for specified chats (or all if none specified)")
-    
-    args = parser.parse_args()
-    
-    # Create bot instance
+async def _cmd_stats(config: Dict[str, Any]) -> int:
+    """Print storage statistics"""
+    storage = StorageManager(config)
+    stats = storage.get_storage_stats()
+    print("\n📊 Storage Statistics:")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+    return 0
+
+
+async def _cmd_reset(config: Dict[str, Any], chat_ids: Optional[list]) -> int:
+    """Reset cursors for the given chats, or all chats if none given"""
+    storage = StorageManager(config)
+    success = storage.reset_cursors(chat_ids)
+    if success:
+        if chat_ids:
+            print(f"✅ Reset cursors for: {', '.join(chat_ids)}")
+        else:
+            print("✅ Reset all cursors")
+    else:
+        print("❌ Failed to reset cursors")
+    return 0 if success else 1
+
+
+async def _cmd_run(args) -> int:
+    """Run the bot once or continuously"""
     bot = TelegramDigestBot(args.config, args.watchlist)
     
     # Load configuration
-    if not bot.load_config():
+    if not await bot.load_config():
         logger.error("Failed to load configuration, exiting")
-        sys.exit(1)
-    
-    # Handle special commands
-    if args.stats:
-        bot.storage = StorageManager(bot.config)
-        stats = bot.storage.get_storage_stats()
-        print("\n📊 Storage Statistics:")
-        for key, value in stats.items():
-            print(f"  {key}: {value}")
-        sys.exit(0)
-    
-    if args.reset_cursors is not None:
-        bot.storage = StorageManager(bot.config) 
-        chat_ids = args.reset_cursors if args.reset_cursors else None
-        success = bot.storage.reset_cursors(chat_ids)
-        if success:
-            if chat_ids:
-                print(f"✅ Reset cursors for: {', '.join(chat_ids)}")
-            else:
-                print("✅ Reset all cursors")
-        else:
-            print("❌ Failed to reset cursors")
-        sys.exit(0 if success else 1)
+        return 1
     
     try:
         # Initialize components
         if not await bot.initialize_components():
             logger.error("Failed to initialize bot components, exiting")
-            sys.exit(1)
+            return 1
         
         # Run bot
         if args.once:
             success = await bot.run_once()
-            # For --once mode, disconnect immediately and exit
-            await bot.cleanup()
-            sys.exit(0 if success else 1)
-        else:
-            await bot.run_continuous()
+            return 0 if success else 1
+        
+        # Let Ctrl-C / SIGTERM wake the sleeping loop for an immediate graceful stop
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, bot.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform, KeyboardInterrupt still applies
+        await bot.run_continuous()
+        return 0
     
     except KeyboardInterrupt:
         logger.info("Received interrupt, shutting down...")
+        return 0
     except Exception as e:
         logger.error(f"Fatal error: {e}")
-        sys.exit(1)
+        return 1
     finally:
-        # Only cleanup if not in --once mode (already cleaned up above)
-        if not args.once:
-            await bot.cleanup()
+        await bot.cleanup()
+        await close_shared_async_client()
+
+
+async def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Telegram Digest Bot")
+    parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file path")
+    parser.add_argument("--watchlist", default="watchlist.yml", help="Watchlist file path") 
+    parser.add_argument("--stats", action="store_true", help="Show storage statistics")
+    parser.add_argument("--reset-cursors", nargs="*", help="Reset cursors for specified chats (or all if none specified)")
+    
+    args = parser.parse_args()
+    
+    # Admin commands only need the config file, not a full bot
+    if args.stats or args.reset_cursors is not None:
+        try:
+            config = await asyncio.to_thread(load_yaml, args.config)
+        except Exception as e:
+            logger.error(f"Failed to load configuration, exiting: {e}")
+            sys.exit(1)
+        
+        if args.stats:
+            sys.exit(await _cmd_stats(config))
+        sys.exit(await _cmd_reset(config, args.reset_cursors or None))
+    
+    sys.exit(await _cmd_run(args))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # uvloop is optional (and unavailable on Windows)
+        uvloop = None
+    
+    if uvloop and sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
+    else:
+        if uvloop:
+            uvloop.install()
+        asyncio.run(main())
\ No newline at end of file
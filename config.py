@@ -3,9 +3,13 @@ Configuration loader for Telegram Digest Bot
 Loads YAML configs and merges with environment variables
 """
 import os
-import yaml
 from typing import Dict, Any
-from dotenv import load_dotenv
+
+from src.yaml_cache import load_yaml, get_safe_loader
+
+
+# dotenv is imported on first use so importing this module stays cheap
+_dotenv_loaded = False
 
 
 def load_config() -> Dict[str, Any]:
@@ -13,21 +17,23 @@ def load_config() -> Dict[str, Any]:
     Load and validate configuration from YAML files and environment variables
     Priority: .env variables override config.yaml values
     """
-    # Load environment variables first
-    load_dotenv()
+    # Load environment variables first (once per process)
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
     
     # Load main config
     try:
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_yaml('config.yaml')
     except FileNotFoundError:
         print("config.yaml not found, using default configuration")
         config = {}
     
     # Load watchlist
     try:
-        with open('watchlist.yaml', 'r') as f:
-            watchlist = yaml.safe_load(f)
+        watchlist = load_yaml('watchlist.yaml')
     except FileNotFoundError:
         print("watchlist.yaml not found, no chats will be monitored")
         watchlist = {'chats': []}
@@ -131,6 +137,7 @@ def _validate_config(config: Dict[str, Any]) -> None:
         print("Warning: No chats configured in watchlist")
     
     print(f"Configuration loaded successfully:")
+    print(f"  - YAML loader: {get_safe_loader().__name__}")
     print(f"  - Telegram API ID: {config['telegram']['api_id']}")
     print(f"  - LLM Provider: {config['llm']['provider']}")
     print(f"  - Hours back: {config['settings']['hours_back']}")
@@ -4,10 +4,60 @@ Supports OpenAI Responses API and Ollama Chat API with basic dict validation (no
 """
 import json
 import time
-from typing import Dict, Any, List
-from openai import OpenAI
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Any, List, Optional
+from openai import AsyncOpenAI
 import httpx
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional, fall back to DigestStructure.validate
+    msgspec = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib type
+_json_loads = orjson.loads if orjson else json.loads
+
+_ollama_client: Optional[httpx.AsyncClient] = None
+_openai_clients: Dict[Optional[str], AsyncOpenAI] = {}
+
+
+def get_ollama_client() -> httpx.AsyncClient:
+    """Return the process-wide Ollama HTTP client, keeping connections alive across digest runs"""
+    global _ollama_client
+    if _ollama_client is None or _ollama_client.is_closed:
+        _ollama_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(300.0, connect=10.0),  # 5 minute timeout for local models
+            limits=httpx.Limits(max_connections=10, keepalive_expiry=30),
+            headers={"Accept-Encoding": "gzip"}
+        )
+    return _ollama_client
+
+
+def get_openai_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """Return the process-wide OpenAI client for api_key, reusing its connection pool across digest runs"""
+    client = _openai_clients.get(api_key)
+    if client is None:
+        client = _openai_clients[api_key] = AsyncOpenAI(api_key=api_key)
+    return client
+
+
+async def close_llm_clients():
+    """Close the shared OpenAI and Ollama HTTP clients if any were created"""
+    global _ollama_client
+    if _ollama_client is not None and not _ollama_client.is_closed:
+        await _ollama_client.aclose()
+    _ollama_client = None
+    
+    for client in _openai_clients.values():
+        await client.close()
+    _openai_clients.clear()
+
 
 class DigestStructure:
     """Simple validation structure without Pydantic"""
@@ -86,60 +136,99 @@ class DigestStructure:
         return validated
 
 
+if msgspec is not None:
+    class _Topic(msgspec.Struct):
+        topic: str = ''
+        summary: str = ''
+        participants: List[str] = []
+        source_chat: str = ''
+        chat_url: str = ''
+
+    class _PersonUpdate(msgspec.Struct):
+        person: str = ''
+        update: str = ''
+
+    class _CalendarEvent(msgspec.Struct):
+        event: str = ''
+        date: str = ''
+        time: Optional[str] = None
+
+        def __post_init__(self):
+            # Match DigestStructure.validate, which maps an empty time to None
+            if not self.time:
+                self.time = None
+
+    class _Digest(msgspec.Struct):
+        """Typed digest schema, decoded and validated in one pass"""
+        urgent: List[str] = []
+        decisions: List[str] = []
+        topics: List[_Topic] = []
+        people_updates: List[_PersonUpdate] = []
+        calendar: List[_CalendarEvent] = []
+        unanswered_mentions: List[str] = []
+
+    _DIGEST_DECODER = msgspec.json.Decoder(_Digest)
+else:
+    _DIGEST_DECODER = None
+
+
+def parse_digest_json(content: str) -> Dict[str, Any]:
+    """
+    Parse and validate the LLM's JSON reply into the digest structure
+    Raises json.JSONDecodeError if the content is not valid JSON
+    """
+    if _DIGEST_DECODER is not None:
+        try:
+            return msgspec.to_builtins(_DIGEST_DECODER.decode(content))
+        except msgspec.DecodeError:
+            pass  # Malformed JSON or loosely-typed fields: use the coercing validator below
+    
+    return DigestStructure.validate(_json_loads(content))
+
+
 def format_messages_for_llm(messages: List[Dict[str, Any]]) -> str:
     """Format collected messages into text for LLM processing"""
     if not messages:
         return "No messages to process."
     
-    # Group messages by chat for better organization
-    messages_by_chat = {}
-    chat_urls = {}  # Store chat URLs
+    # One sort groups messages by chat, with each chat already in time order
+    sorted_messages = sorted(messages, key=lambda x: (x['chat'], x['time']))
     
-    for msg in messages:
-        chat_name = msg['chat']
-        if chat_name not in messages_by_chat:
-            messages_by_chat[chat_name] = []
-        messages_by_chat[chat_name].append(msg)
-        
-        # Store chat URL (will be the same for all messages from this chat)
-        if msg.get('chat_url'):
-            chat_urls[chat_name] = msg['chat_url']
+    # Store chat URLs (will be the same for all messages from a chat)
+    chat_urls = {msg['chat']: msg['chat_url'] for msg in messages if msg.get('chat_url')}
     
     # Add chat URLs section for LLM reference
-    formatted_text = "Chat URLs for linking:\n"
+    parts = ["Chat URLs for linking:\n"]
     for chat_name, url in chat_urls.items():
-        formatted_text += f"- {chat_name}: {url}\n"
-    formatted_text += "\n"
+        parts.append(f"- {chat_name}: {url}\n")
+    parts.append("\n")
     
-    for chat_name, chat_messages in messages_by_chat.items():
-        formatted_text += f"\n## {chat_name} ({len(chat_messages)} messages)\n"
+    chat_count = 0
+    for chat_name, group in groupby(sorted_messages, key=itemgetter('chat')):
+        chat_messages = list(group)
+        chat_count += 1
+        parts.append(f"\n## {chat_name} ({len(chat_messages)} messages)\n")
         
-        # Sort messages by timestamp within each chat
-        chat_messages.sort(key=lambda x: x['time'])
-        
-        # Add time range info
-        if chat_messages:
-            start_time = chat_messages[0]['time'].strftime("%H:%M")
-            end_time = chat_messages[-1]['time'].strftime("%H:%M")
-            date = chat_messages[0]['time'].strftime("%Y-%m-%d")
-            formatted_text += f"Time range: {date} {start_time} - {end_time}\n\n"
+        # Add time range info (groupby never yields an empty group)
+        start_time = chat_messages[0]['time'].strftime("%H:%M")
+        end_time = chat_messages[-1]['time'].strftime("%H:%M")
+        date = chat_messages[0]['time'].strftime("%Y-%m-%d")
+        parts.append(f"Time range: {date} {start_time} - {end_time}\n\n")
         
         # Add messages
-        for msg in chat_messages:
-            timestamp = msg['time'].strftime("%H:%M")
-            formatted_text += f"[{timestamp}] {msg['sender']}: {msg['text']}\n"
+        parts.extend(f"[{msg['time']:%H:%M}] {msg['sender']}: {msg['text']}\n" for msg in chat_messages)
         
-        formatted_text += "\n"
+        parts.append("\n")
     
     # Add summary statistics
     total_messages = len(messages)
     stats = f"""Message Statistics:
 - Total messages: {total_messages}
-- Chats involved: {len(messages_by_chat)}
+- Chats involved: {chat_count}
 
 """
     
-    return stats + formatted_text
+    return stats + "".join(parts)
 
 
 async def generate_digest(messages: List[Dict[str, Any]], prompt: str, llm_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -169,7 +258,7 @@ async def _generate_with_openai(messages_text: str, prompt: str, openai_config:
     request_id = f"openai_{int(time.time())}"
     
     # Prepare OpenAI client
-    client = OpenAI(api_key=openai_config.get('api_key'))
+    client = get_openai_client(openai_config.get('api_key'))
     model = openai_config.get('model', 'gpt-4o-mini')
     
     # Prepare input text
@@ -182,27 +271,30 @@ Please analyze these messages and respond with valid JSON matching the required
     try:
         print(f"[{request_id}] Sending messages to OpenAI model {model}")
         
-        start_time = time.time()
+        start_time = time.monotonic()
         
-        # Make API call using regular chat completion
-        response = client.chat.completions.create(
+        # Stream the chat completion so the event loop stays free while tokens arrive
+        chunks = []
+        stream = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "user", "content": input_text}
             ],
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            stream=True
         )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
         
-        processing_time = time.time() - start_time
+        processing_time = time.monotonic() - start_time
         print(f"[{request_id}] OpenAI response received in {processing_time:.2f} seconds")
         
-        # Extract response content
-        content = response.choices[0].message.content
+        content = "".join(chunks)
         
         # Parse JSON response
         try:
-            raw_data = json.loads(content)
-            validated_data = DigestStructure.validate(raw_data)
+            validated_data = parse_digest_json(content)
             print(f"[{request_id}] Successfully parsed OpenAI response")
             return validated_data
         except json.JSONDecodeError as e:
@@ -237,7 +329,7 @@ async def _generate_with_ollama(messages_text: str, prompt: str, ollama_config:
             }
         ],
         "format": "json",
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": temperature,
             "top_p": top_p
@@ -246,54 +338,41 @@ async def _generate_with_ollama(messages_text: str, prompt: str, ollama_config:
     
     try:
         print(f"[{request_id}] Sending messages to Ollama model {model}")
-        print(f"[{request_id}] System prompt preview: {request_data['messages'][0]['content'][:200]}...")
-        print(f"[{request_id}] User messages preview: {request_data['messages'][1]['content'][:500]}...")
         
-        start_time = time.time()
+        start_time = time.monotonic()
         
-        async with httpx.AsyncClient(timeout=300) as client:  # 5 minute timeout
-            response = await client.post(
-                f"{base_url}/api/chat",
-                json=request_data
-            )
+        # Ollama streams one JSON object per line; the final one (done=true) carries the metrics
+        chunks = []
+        final_chunk = {}
+        async with get_ollama_client().stream("POST", f"{base_url}/api/chat", json=request_data) as response:
             response.raise_for_status()
-            
-            processing_time = time.time() - start_time
-            print(f"[{request_id}] Ollama response received in {processing_time:.2f} seconds")
-            
-            response_data = response.json()
-            
-            # Log the full response structure first
-            print(f"[{request_id}] Full Ollama response structure:")
-            print("=" * 60)
-            print(f"Response keys: {list(response_data.keys())}")
-            if 'message' in response_data:
-                print(f"Message keys: {list(response_data['message'].keys())}")
-            print("=" * 60)
-            
-            content = response_data.get('message', {}).get('content', '')
-            
-            # Log performance metrics if available
-            if 'eval_duration' in response_data:
-                eval_time = response_data['eval_duration'] / 1e9  # Convert to seconds
-                print(f"[{request_id}] Model evaluation time: {eval_time:.2f} seconds")
-            
-            # Log the extracted content
-            print(f"[{request_id}] Extracted content from response:")
-            print("=" * 60)
-            print(content)
-            print("=" * 60)
-            
-            # Parse JSON response
-            try:
-                raw_data = json.loads(content)
-                validated_data = DigestStructure.validate(raw_data)
-                print(f"[{request_id}] Successfully parsed Ollama response")
-                return validated_data
-            except json.JSONDecodeError as e:
-                print(f"[{request_id}] Failed to parse JSON response: {e}")
-                print(f"[{request_id}] Raw content: {content[:500]}...")
-                return DigestStructure.validate({})
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                chunks.append(chunk.get('message', {}).get('content', ''))
+                if chunk.get('done'):
+                    final_chunk = chunk
+        
+        processing_time = time.monotonic() - start_time
+        print(f"[{request_id}] Ollama response received in {processing_time:.2f} seconds")
+        
+        content = "".join(chunks)
+        
+        # Log performance metrics if available
+        if 'eval_duration' in final_chunk:
+            eval_time = final_chunk['eval_duration'] / 1e9  # Convert to seconds
+            print(f"[{request_id}] Model evaluation time: {eval_time:.2f} seconds")
+        
+        # Parse JSON response
+        try:
+            validated_data = parse_digest_json(content)
+            print(f"[{request_id}] Successfully parsed Ollama response")
+            return validated_data
+        except json.JSONDecodeError as e:
+            print(f"[{request_id}] Failed to parse JSON response: {e}")
+            print(f"[{request_id}] Raw content: {content[:500]}...")
+            return DigestStructure.validate({})
     
     except httpx.HTTPError as e:
         print(f"[{request_id}] HTTP error calling Ollama API: {e}")
@@ -7,7 +7,7 @@ import asyncio
 import sys
 from config import load_config
 from telegram import collect_messages, send_summary
-from llm import generate_digest
+from llm import generate_digest, close_llm_clients
 from output import create_markdown_file, format_telegram_summary
 
 
@@ -72,6 +72,9 @@ async def main():
     except Exception as e:
         print(f"❌ Error during digest generation: {e}")
         sys.exit(1)
+    
+    finally:
+        await close_llm_clients()
 
 
 def run_once():
@@ -0,0 +1,118 @@
+"""
+Disk-backed cache for LLM digest responses keyed by a SHA-256 of the request
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the digest prompt/schema changes so old cache entries are ignored
+PROMPT_VERSION = 1
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+
+
+def make_cache_key(provider: str, model: str, system_prompt: str, messages_text: str,
+                   temperature: Optional[float] = None) -> str:
+    """Build a stable cache key from everything that influences the LLM output"""
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "temperature": temperature,
+        "system_prompt": system_prompt,
+        "messages": messages_text,
+        "prompt_version": PROMPT_VERSION
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """Content-addressed JSON cache with per-entry expiry"""
+
+    def __init__(self, path: str = "data/llm_cache.json", ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._io_lock = asyncio.Lock()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        """Read cache entries from disk (runs in a worker thread)"""
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson else json.loads(raw)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("Failed to read LLM cache %s, starting empty: %s", self.path, e)
+            return {}
+
+    def _write_file(self, entries: Dict[str, Dict[str, Any]]):
+        """Atomically write cache entries to disk (runs in a worker thread)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                if orjson:
+                    f.write(orjson.dumps(entries))
+                else:
+                    f.write(json.dumps(entries).encode('utf-8'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning("Failed to write LLM cache %s: %s", self.path, e)
+
+    async def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load cache entries from disk on first use"""
+        async with self._io_lock:
+            if self._entries is None:
+                self._entries = await asyncio.to_thread(self._read_file)
+        return self._entries
+
+    async def _save(self):
+        """Write a snapshot of the entries to disk off the event loop"""
+        # Stored values are never mutated in place, so a shallow snapshot is safe to serialize
+        snapshot = dict(self._entries)
+        async with self._io_lock:
+            await asyncio.to_thread(self._write_file, snapshot)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached value for key, or None if missing or expired"""
+        entries = await self._load()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.get('expires_at', 0) < time.time():
+            del entries[key]
+            await self._save()
+            return None
+
+        return copy.deepcopy(entry.get('value'))
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None):
+        """Store a copy of value under key and drop any expired entries"""
+        entries = await self._load()
+        now = time.time()
+
+        expired = [k for k, entry in entries.items() if entry.get('expires_at', 0) < now]
+        for k in expired:
+            del entries[k]
+
+        entries[key] = {
+            'expires_at': now + (ttl if ttl is not None else self.ttl_seconds),
+            'value': copy.deepcopy(value)
+        }
+        await self._save()
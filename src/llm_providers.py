@@ -7,11 +7,77 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 import httpx
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from src.llm_cache import LLMCache, make_cache_key
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to stdlib json
+    orjson = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 
 logger = logging.getLogger(__name__)
 
+# Pooled HTTP client shared by all provider instances so keep-alive connections
+# survive component reinitialization on config reload
+_shared_async_client: Optional[httpx.AsyncClient] = None
+_shared_sync_client: Optional[httpx.Client] = None
+
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=90)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the stdlib type
+_json_loads = orjson.loads if orjson else json.loads
+
+
+def _json_body(data: Any) -> bytes:
+    """Serialize a request payload to JSON bytes"""
+    return orjson.dumps(data) if orjson else json.dumps(data).encode('utf-8')
+
+
+def get_shared_async_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client used for LLM API calls"""
+    global _shared_async_client
+    if _shared_async_client is None or _shared_async_client.is_closed:
+        _shared_async_client = httpx.AsyncClient(
+            # 5 minute read timeout for local models, but fail fast if the server is unreachable
+            timeout=httpx.Timeout(300.0, connect=10.0),
+            http2=HTTP2_AVAILABLE,
+            limits=_POOL_LIMITS
+        )
+    return _shared_async_client
+
+
+def get_shared_sync_client() -> httpx.Client:
+    """Return the process-wide sync HTTP client used for provider validation"""
+    global _shared_sync_client
+    if _shared_sync_client is None or _shared_sync_client.is_closed:
+        _shared_sync_client = httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            http2=HTTP2_AVAILABLE,
+            limits=_POOL_LIMITS
+        )
+    return _shared_sync_client
+
+
+async def close_shared_async_client():
+    """Close the shared HTTP clients (call once on shutdown)"""
+    global _shared_async_client, _shared_sync_client
+    if _shared_async_client is not None:
+        await _shared_async_client.aclose()
+        _shared_async_client = None
+    if _shared_sync_client is not None:
+        _shared_sync_client.close()
+        _shared_sync_client = None
+
 
 class Topic(BaseModel):
     topic: str
@@ -58,8 +124,9 @@ class OpenAIProvider(LLMProvider):
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.client = OpenAI(
-            api_key=config.get('api_key')  # Will use OPENAI_API_KEY env var if not provided
+        self.client = AsyncOpenAI(
+            api_key=config.get('api_key'),  # Will use OPENAI_API_KEY env var if not provided
+            http_client=get_shared_async_client()  # Reuse the pooled connections across config reloads
         )
         self.model = config.get('model', 'gpt-4.1')
         self.max_tokens = config.get('max_tokens', 2000)
@@ -71,32 +138,37 @@ class OpenAIProvider(LLMProvider):
         request_id = f"openai_{int(time.time())}"
         
         try:
-            # Format the complete input for the Responses API
-            input_text = f"""{system_prompt}
-
-{messages_text}
+            # Keep the system prompt as a separate, byte-stable leading message so the
+            # provider-side prompt cache can reuse it; only the user message varies
+            input_text = f"""{messages_text}
 
 Respond with valid JSON matching the required schema."""
+            request_input = [
+                {"role": "system", "content": system_prompt.strip()},
+                {"role": "user", "content": input_text}
+            ]
 
             # Log request details
             logger.info(f"[{request_id}] Sending request to OpenAI model {self.model}")
-            logger.debug(f"[{request_id}] Request input length: {len(input_text)} characters")
-            logger.debug(f"[{request_id}] Request input preview: {input_text[:500]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] System prompt length: %d characters", request_id, len(system_prompt))
+                logger.debug("[%s] Request input length: %d characters", request_id, len(input_text))
+                logger.debug("[%s] Request input preview: %s...", request_id, input_text[:500])
             
             import time
-            start_time = time.time()
+            start_time = time.monotonic()
             
-            response = self.client.responses.parse(
+            response = await self.client.responses.parse(
                 model=self.model,
-                input=input_text,
+                input=request_input,
                 text_format=DigestStructure
             )
             
             # Log response details
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             logger.info(f"[{request_id}] OpenAI structured response received in {processing_time:.2f} seconds")
-            logger.debug(f"[{request_id}] Response ID: {response.id}")
-            logger.debug(f"[{request_id}] Response status: {response.status}")
+            logger.debug("[%s] Response ID: %s", request_id, response.id)
+            logger.debug("[%s] Response status: %s", request_id, response.status)
             
             # Log token usage
             if hasattr(response, 'usage') and response.usage:
@@ -105,15 +177,18 @@ Respond with valid JSON matching the required schema."""
             
             # Log model info
             if hasattr(response, 'model'):
-                logger.debug(f"[{request_id}] Actual model used: {response.model}")
+                logger.debug("[%s] Actual model used: %s", request_id, response.model)
             
-            # Get the structured output
-            parsed_result = response.output_parsed
+            # The structured output text was already validated against DigestStructure, so
+            # decode it directly rather than walking the Pydantic model back into dicts
+            output_text = getattr(response, 'output_text', None)
+            if output_text:
+                result = _json_loads(output_text)
+            else:
+                result = response.output_parsed.model_dump()
             logger.info(f"[{request_id}] Successfully received structured OpenAI response")
-            
-            # Convert Pydantic model to dict
-            result = parsed_result.model_dump()
-            logger.debug(f"[{request_id}] Parsed JSON keys: {list(result.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Parsed JSON keys: %s", request_id, list(result.keys()))
             return result
                 
         except Exception as e:
@@ -126,14 +201,16 @@ Respond with valid JSON matching the required schema."""
                 "topics": [],
                 "people_updates": [],
                 "calendar": [],
-                "unanswered_mentions": []
+                "unanswered_mentions": [],
+                "_error": f"OpenAI API call failed: {str(e)}"
             }
     
     def validate_config(self) -> bool:
         """Validate OpenAI configuration"""
         try:
-            # Test with a simple request
-            test_response = self.client.responses.create(
+            # Test with a simple request (synchronous client, validation runs outside the digest path)
+            sync_client = OpenAI(api_key=self.config.get('api_key'), http_client=get_shared_sync_client())
+            test_response = sync_client.responses.create(
                 model=self.model,
                 input="Test connection. Respond with: OK"
             )
@@ -165,7 +242,7 @@ class OllamaProvider(LLMProvider):
         self.model = config.get('model', 'llama3.2:latest')
         self.temperature = config.get('temperature', 0.3)
         self.top_p = config.get('top_p', 0.9)
-        self.client = httpx.AsyncClient(timeout=300)  # 5 minute timeout for local models
+        self.client = get_shared_async_client()
     
     async def generate_digest(self, messages_text: str, system_prompt: str) -> Dict[str, Any]:
         """Generate digest using Ollama Chat API"""
@@ -187,7 +264,7 @@ class OllamaProvider(LLMProvider):
                     }
                 ],
                 "format": "json",
-                "stream": False,
+                "stream": True,
                 "options": {
                     "temperature": self.temperature,
                     "top_p": self.top_p
@@ -196,29 +273,44 @@ class OllamaProvider(LLMProvider):
             
             # Log request details
             logger.info(f"[{request_id}] Sending request to Ollama model {self.model}")
-            logger.debug(f"[{request_id}] Request URL: {self.base_url}/api/chat")
-            logger.debug(f"[{request_id}] System prompt length: {len(system_prompt)} characters")
-            logger.debug(f"[{request_id}] User messages length: {len(messages_text)} characters")
-            logger.debug(f"[{request_id}] Request options: temperature={self.temperature}, top_p={self.top_p}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Request URL: %s/api/chat", request_id, self.base_url)
+                logger.debug("[%s] System prompt length: %d characters", request_id, len(system_prompt))
+                logger.debug("[%s] User messages length: %d characters", request_id, len(messages_text))
+                logger.debug("[%s] Request options: temperature=%s, top_p=%s", request_id, self.temperature, self.top_p)
             
-            start_time = time.time()
+            start_time = time.monotonic()
             
-            response = await self.client.post(
+            # Stream the NDJSON chunks so the body is consumed as tokens are generated
+            content_parts = []
+            response_data = {}
+            async with self.client.stream(
+                "POST",
                 f"{self.base_url}/api/chat",
-                json=request_data
-            )
-            response.raise_for_status()
+                content=_json_body(request_data),
+                headers=_JSON_HEADERS
+            ) as response:
+                logger.debug("[%s] HTTP status: %s", request_id, response.status_code)
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    content_parts.append(chunk.get('message', {}).get('content', ''))
+                    if chunk.get('done'):
+                        response_data = chunk  # The final chunk carries the timing metrics
+                        break
             
             # Log response details
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             logger.info(f"[{request_id}] Ollama response received in {processing_time:.2f} seconds")
-            logger.debug(f"[{request_id}] HTTP status: {response.status_code}")
             
-            response_data = response.json()
-            content = response_data.get('message', {}).get('content', '')
+            content = "".join(content_parts)
             
-            logger.debug(f"[{request_id}] Response content length: {len(content)} characters")
-            logger.debug(f"[{request_id}] Raw response data keys: {list(response_data.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Response content length: %d characters", request_id, len(content))
+                logger.debug("[%s] Raw response data keys: %s", request_id, list(response_data.keys()))
             
             # Log additional metrics if available
             if 'eval_duration' in response_data:
@@ -230,13 +322,15 @@ class OllamaProvider(LLMProvider):
             if 'eval_count' in response_data:
                 logger.info(f"[{request_id}] Tokens generated: {response_data['eval_count']}")
             
-            logger.debug(f"[{request_id}] Response content preview: {content[:500]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Response content preview: %s...", request_id, content[:500])
             
             # Parse the JSON response
             try:
-                result = json.loads(content)
+                result = _json_loads(content)
                 logger.info(f"[{request_id}] Successfully parsed Ollama response as JSON")
-                logger.debug(f"[{request_id}] Parsed JSON keys: {list(result.keys())}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[%s] Parsed JSON keys: %s", request_id, list(result.keys()))
                 return result
             except json.JSONDecodeError as e:
                 logger.error(f"[{request_id}] Failed to parse Ollama response as JSON: {e}")
@@ -265,19 +359,16 @@ class OllamaProvider(LLMProvider):
     def validate_config(self) -> bool:
         """Validate Ollama configuration"""
         try:
-            # Test connection and model availability using synchronous HTTP client
-            import httpx
-            
-            with httpx.Client(timeout=30) as sync_client:
-                response = sync_client.post(
-                    f"{self.base_url}/api/chat",
-                    json={
-                        "model": self.model,
-                        "messages": [{"role": "user", "content": "Test"}],
-                        "stream": False
-                    }
-                )
-                return response.status_code == 200
+            # Test connection and model availability using the pooled synchronous HTTP client
+            response = get_shared_sync_client().post(
+                f"{self.base_url}/api/chat",
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": "Test"}],
+                    "stream": False
+                }
+            )
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Ollama config validation failed: {e}")
             return False
@@ -289,6 +380,7 @@ class LLMManager:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.provider = self._create_provider()
+        self.cache = self._create_cache()
     
     def _create_provider(self) -> LLMProvider:
         """Create the appropriate LLM provider based on config"""
@@ -301,9 +393,45 @@ class LLMManager:
         else:
             raise ValueError(f"Unsupported LLM provider: {provider_type}")
     
+    def _create_cache(self) -> Optional[LLMCache]:
+        """Create the response cache unless disabled in config"""
+        cache_config = self.config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        
+        return LLMCache(
+            cache_config.get('path', 'data/llm_cache.json'),
+            int(cache_config.get('ttl_hours', 168) * 3600)
+        )
+    
     async def generate_digest(self, messages_text: str, system_prompt: str) -> Dict[str, Any]:
-        """Generate digest using the configured provider"""
-        return await self.provider.generate_digest(messages_text, system_prompt)
+        """Generate digest using the configured provider, reusing cached responses"""
+        if not self.cache:
+            return await self.provider.generate_digest(messages_text, system_prompt)
+        
+        # Key on the normalized provider type and the model the provider actually runs,
+        # which includes its default when the config leaves the model out
+        provider_type = self.config.get('provider', 'openai').lower()
+        cache_key = make_cache_key(
+            provider_type,
+            self.provider.model,
+            system_prompt,
+            messages_text,
+            getattr(self.provider, 'temperature', None)
+        )
+        
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM cache hit (%s), skipping %s call", cache_key[:12], provider_type)
+            return cached
+        
+        result = await self.provider.generate_digest(messages_text, system_prompt)
+        
+        # Don't cache fallback structures produced by failed calls
+        if '_error' not in result:
+            await self.cache.set(cache_key, result)
+        
+        return result
     
     def validate_config(self) -> bool:
         """Validate the current provider configuration"""
@@ -0,0 +1,60 @@
+"""
+Async token-bucket rate limiter for outgoing Telegram messages
+"""
+import asyncio
+import time
+from typing import Dict, Any, List
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` acquisitions per `period` seconds"""
+
+    def __init__(self, rate: float, period: float = 1.0):
+        self.capacity = rate
+        self.refill_per_second = rate / period
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    async def acquire(self, n: int = 1):
+        """Wait until n tokens are available and consume them"""
+        async with self._lock:
+            while True:
+                self._refill(time.monotonic())
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+
+                await asyncio.sleep((n - self.tokens) / self.refill_per_second)
+
+
+class RateLimiter:
+    """Combines several token buckets, e.g. a per-second and a per-minute limit"""
+
+    def __init__(self, buckets: List[TokenBucket]):
+        self.buckets = buckets
+        self.blocked_until = 0.0
+
+    @classmethod
+    def from_config(cls, rate_config: Dict[str, Any]) -> 'RateLimiter':
+        """Build from telegram.rate_limit config (defaults: 1 msg/s, 20 msg/min)"""
+        return cls([
+            TokenBucket(rate_config.get('messages_per_second', 1), 1.0),
+            TokenBucket(rate_config.get('messages_per_minute', 20), 60.0)
+        ])
+
+    def pause(self, seconds: float):
+        """Halt all pending acquisitions for the given number of seconds (e.g. Telegram retry_after).
+        This is a shared "not before" deadline; the buckets keep their tokens and keep refilling."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self, n: int = 1):
+        """Wait out any pause, then until every bucket allows n more acquisitions"""
+        while (delay := self.blocked_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        for bucket in self.buckets:
+            await bucket.acquire(n)
@@ -0,0 +1,50 @@
+"""
+Cached YAML file loading shared by the bot and the standalone config loader
+"""
+import copy
+import os
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+# yaml is imported on first use so importing this module stays cheap
+_safe_loader = None
+
+# Parsed YAML keyed by path, validated against (mtime, size); LRU-evicted
+_YAML_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_YAML_CACHE_MAX_ENTRIES = 100
+
+
+def get_safe_loader():
+    """Return PyYAML's C SafeLoader, or the pure-Python one if built without libyaml"""
+    global _safe_loader
+    if _safe_loader is None:
+        try:
+            from yaml import CSafeLoader as SafeLoader
+        except ImportError:  # PyYAML built without libyaml
+            from yaml import SafeLoader
+        _safe_loader = SafeLoader
+    return _safe_loader
+
+
+def load_yaml(path: str, st: Optional[os.stat_result] = None) -> Any:
+    """Parse a YAML file, reusing the previous parse if the file is unchanged.
+    Pass st when the caller has already stat'ed the file, so the cache key is
+    never newer than the data it was recorded for."""
+    if st is None:
+        st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        _YAML_CACHE.move_to_end(path)
+        return copy.deepcopy(cached[2])
+
+    import yaml
+
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=get_safe_loader())
+
+    _YAML_CACHE[path] = (st.st_mtime, st.st_size, data)
+    _YAML_CACHE.move_to_end(path)
+    while len(_YAML_CACHE) > _YAML_CACHE_MAX_ENTRIES:
+        _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
@@ -8,12 +8,18 @@ from typing import List, Dict, Any, Optional
 from telethon import TelegramClient
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
 
+# Chats fetched at once; a wider fan-out makes Telegram flood waits much more likely
+DEFAULT_MAX_CONCURRENT_CHATS = 4
+# Flood waits tolerated per chat before giving up on it for this run
+MAX_FLOOD_WAIT_RETRIES = 3
+
 
 class TelegramDigestClient:
     def __init__(self, telegram_config: Dict[str, Any]):
         self.api_id = telegram_config['api_id']
         self.api_hash = telegram_config['api_hash']
         self.session_file = telegram_config['session_file']
+        self.max_concurrent_chats = max(1, telegram_config.get('max_concurrent_chats', DEFAULT_MAX_CONCURRENT_CHATS))
         
         self.client = TelegramClient(
             self.session_file,
@@ -59,10 +65,8 @@ class TelegramDigestClient:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
         print(f"Collecting messages from last {hours_back} hours (since {cutoff_time})")
         
-        all_messages = []
-        chats = watchlist.get('chats', [])
-        
-        for chat_config in chats:
+        chat_identifiers = []
+        for chat_config in watchlist.get('chats', []):
             if not chat_config.get('enabled', True):
                 continue
             
@@ -71,17 +75,26 @@ class TelegramDigestClient:
                 print(f"Skipping chat config with no identifier: {chat_config}")
                 continue
             
-            try:
-                messages = await self._collect_chat_messages(chat_identifier, cutoff_time)
-                if messages:
-                    all_messages.extend(messages)
-                    print(f"Collected {len(messages)} messages from {chat_identifier}")
-                else:
-                    print(f"No recent messages from {chat_identifier}")
-                    
-            except Exception as e:
-                print(f"Failed to collect messages from {chat_identifier}: {e}")
-                continue
+            chat_identifiers.append(chat_identifier)
+        
+        # Fetch chats concurrently so network round-trips overlap, bounded to stay clear of flood waits
+        semaphore = asyncio.Semaphore(self.max_concurrent_chats)
+        
+        async def collect_bounded(chat_identifier):
+            async with semaphore:
+                return await self._collect_chat_messages(chat_identifier, cutoff_time)
+        
+        results = await asyncio.gather(
+            *(collect_bounded(chat_identifier) for chat_identifier in chat_identifiers)
+        )
+        
+        all_messages = []
+        for chat_identifier, messages in zip(chat_identifiers, results):
+            if messages:
+                all_messages.extend(messages)
+                print(f"Collected {len(messages)} messages from {chat_identifier}")
+            else:
+                print(f"No recent messages from {chat_identifier}")
         
         # Sort all messages by timestamp
         all_messages.sort(key=lambda x: x['time'])
@@ -90,35 +103,44 @@ class TelegramDigestClient:
         return all_messages
 
     async def _collect_chat_messages(self, chat_identifier: str, cutoff_time: datetime) -> List[Dict[str, Any]]:
-        """Collect messages from a single chat with client-side time filtering"""
-        try:
-            # Get chat entity
-            entity = await self.client.get_entity(chat_identifier)
-            chat_name = getattr(entity, 'title', str(chat_identifier))
-            
-            messages = []
-            message_limit = 500  # Fetch more to ensure we get recent ones
-            
-            async for message in self.client.iter_messages(entity, limit=message_limit):
-                # Client-side time filtering - keep messages AFTER cutoff time
-                if message.date >= cutoff_time:
-                    if message.text:  # Only process messages with text
-                        normalized_msg = await self._normalize_message(message, chat_name, entity)
-                        messages.append(normalized_msg)
-                else:
-                    # Since messages are in reverse chronological order,
-                    # we can stop once we hit old messages
-                    break
-            
-            return messages
-            
-        except FloodWaitError as e:
-            print(f"Rate limited for {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-            return []
-        except Exception as e:
-            print(f"Error collecting from {chat_identifier}: {e}")
-            return []
+        """Collect messages from a single chat with client-side time filtering.
+        Flood waits are slept out and the fetch retried, so rate-limited chats are delayed, not dropped."""
+        for attempt in range(MAX_FLOOD_WAIT_RETRIES + 1):
+            try:
+                return await self._fetch_chat_messages(chat_identifier, cutoff_time)
+            except FloodWaitError as e:
+                if attempt == MAX_FLOOD_WAIT_RETRIES:
+                    print(f"Rate limited on {chat_identifier} too many times, skipping it this run")
+                    return []
+                print(f"Rate limited for {e.seconds} seconds on {chat_identifier}, retrying")
+                await asyncio.sleep(e.seconds)
+            except Exception as e:
+                print(f"Error collecting from {chat_identifier}: {e}")
+                return []
+
+    async def _fetch_chat_messages(self, chat_identifier: str, cutoff_time: datetime) -> List[Dict[str, Any]]:
+        """Fetch and normalize one chat's messages newer than cutoff_time"""
+        # Get chat entity
+        entity = await self.client.get_entity(chat_identifier)
+        chat_name = getattr(entity, 'title', str(chat_identifier))
+        # The URL only depends on the chat, so build it once rather than per message
+        chat_url = self._generate_chat_url(entity)
+        
+        messages = []
+        message_limit = 500  # Fetch more to ensure we get recent ones
+        
+        async for message in self.client.iter_messages(entity, limit=message_limit):
+            # Client-side time filtering - keep messages AFTER cutoff time
+            if message.date >= cutoff_time:
+                if message.text:  # Only process messages with text
+                    normalized_msg = await self._normalize_message(message, chat_name, chat_url)
+                    messages.append(normalized_msg)
+            else:
+                # Since messages are in reverse chronological order,
+                # we can stop once we hit old messages
+                break
+        
+        return messages
 
     def _generate_chat_url(self, entity) -> str:
         """Generate Telegram URL for a chat entity"""
@@ -130,7 +152,7 @@ class TelegramDigestClient:
             return f"tg://resolve?domain={entity.id}"
         return ""
 
-    async def _normalize_message(self, message, chat_name: str, entity) -> Dict[str, Any]:
+    async def _normalize_message(self, message, chat_name: str, chat_url: str) -> Dict[str, Any]:
         """Convert Telethon message to normalized dictionary format"""
         # Get sender name
         sender_name = "Unknown"
@@ -144,9 +166,6 @@ class TelegramDigestClient:
             elif hasattr(message.sender, 'username'):
                 sender_name = f"@{message.sender.username}"
         
-        # Generate chat URL
-        chat_url = self._generate_chat_url(entity)
-        
         return {
             'chat': chat_name,
             'chat_url': chat_url,